@@ -1,165 +1,57 @@
 import streamlit as st
-import requests
-from datetime import datetime
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import aiohttp
+import orjson
+from collections import OrderedDict, namedtuple
+import redis
+import redis.asyncio
+from urllib.parse import urlencode, urlsplit
 import pandas as pd
-import plotly.graph_objects as go
+import streamlit.components.v1 as components
+from string import Template
 
 st.set_page_config(page_title="Crypto Next-Day High Dashboard", layout="wide")
 
-if 'predictions' not in st.session_state:
-    st.session_state.predictions = {}
-if 'prediction_time' not in st.session_state:
-    st.session_state.prediction_time = {}
-if 'selected_coin' not in st.session_state:
-    st.session_state.selected_coin = 'Bitcoin'
-
-@st.cache_data(ttl=60)
-def get_crypto_prices():
-    url = "https://api.coingecko.com/api/v3/simple/price"
-    params = {"ids": "bitcoin,ethereum,xrp,solana", "vs_currencies": "usd", "include_24hr_change": "true"}
-    try:
-        data = requests.get(url, params=params, timeout=5).json()
-        if not data:
-            raise ValueError("No data received")
-        parts = []
-        for coin, info in data.items():
-            symbol = {"bitcoin": "BTC", "ethereum": "ETH", "xrp": "XRP", "solana": "SOL"}[coin]
-            price = info.get("usd", 0)
-            change = info.get("usd_24h_change", 0)
-            arrow = "▲" if change >= 0 else "▼"
-            color = "#2D9F4F" if change >= 0 else "#D9534F"
-            parts.append(
-                f"<span style='color:#2C2C2C;font-weight:600'>{symbol}/USD</span> "
-                f"<span style='color:#5A5A5A'>{price:,.2f}</span> "
-                f"<span style='color:{color};font-weight:600'>{arrow}{abs(change):.2f}%</span>"
-            )
-        return "  ".join(parts)
-    except Exception:
-        return "BTC/USD 67,450 ▲1.25% ETH/USD 3,120 ▲0.84% XRP/USD 0.512 ▼0.34% SOL/USD 102.4 ▲2.02%"
+REDIS_URL = os.environ.get("REDIS_URL")
+RETRY_STATUSES = {429, 502, 503, 504}
+WARMUP_INTERVAL = 600
+# Predictions are re-fetched after PREDICTION_REFRESH; the last good one is served for up to PREDICTION_TTL if the API is down
+PREDICTION_REFRESH = 180
+PREDICTION_TTL = 86400
+PREDICTION_CACHE_SIZE = 1024
+# Response keys used by the different prediction APIs, in lookup order (XRP returns its value as a string)
+PREDICTION_KEYS = ('predicted_next_day_high_usd', 'predicted_next_day_high', 'prediction', 'predicted_high', 'next_day_high', 'high', 'predicted_high_next')
 
-@st.cache_data(ttl=300)
-def get_coin_history(coin_id):
-    url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
-    params = {"vs_currency": "usd", "days": "7"}
-    try:
-        response = requests.get(url, params=params, timeout=10).json()
-        if not response.get("prices"):
-            return None
-        
-        prices = response["prices"]
-        
-        # Group by date
-        daily_data = {}
-        for price_point in prices:
-            timestamp = price_point[0] / 1000
-            date = datetime.fromtimestamp(timestamp).date()
-            price = price_point[1]
-            
-            if date not in daily_data:
-                daily_data[date] = []
-            daily_data[date].append(price)
-        
-        # Calculate daily OHLC
-        result = []
-        for date, prices in sorted(daily_data.items()):
-            result.append({
-                "date": datetime.combine(date, datetime.min.time()),
-                "open": prices[0],
-                "high": max(prices),
-                "low": min(prices),
-                "close": prices[-1]
-            })
-        
-        return result[-7:]  # Only return the last 7 days
-    except Exception:
-        return None
+API_URLS = {
+    "BTC": "https://at3-bitcoin-latest-1.onrender.com/predict/bitcoin",
+    "ETH": "https://ethereum-api-studentB.onrender.com/predict",
+    "XRP": "https://three6120-25sp-at3-group08-25660135-api.onrender.com/predict_latest",
+    "SOL": "https://solana-fastapi.onrender.com/predict" 
+}
 
-def plot_candlestick(data, symbol):
-    if not data:
-        return None
-    df = pd.DataFrame(data)
-    
-    fig = go.Figure(data=[go.Candlestick(
-        x=df['date'],
-        open=df['open'],
-        high=df['high'],
-        low=df['low'],
-        close=df['close'],
-        increasing_line_color='#4CAF50',
-        decreasing_line_color='#EF5350',
-        increasing_fillcolor='rgba(76, 175, 80, 0.7)',
-        decreasing_fillcolor='rgba(239, 83, 80, 0.7)'
-    )])
-    fig.update_layout(
-        title=f"{symbol} 7-Day Candlestick Chart",
-        xaxis_title="Date",
-        yaxis_title="Price (USD)",
-        template="plotly_white",
-        height=400,
-        margin=dict(l=20, r=20, t=40, b=20),
-        paper_bgcolor='#FAF8F3',
-        plot_bgcolor='#FFFFFF',
-        font=dict(color='#3A3A3A', size=10),
-        xaxis=dict(gridcolor='rgba(0,0,0,0.08)', rangeslider=dict(visible=False)),
-        yaxis=dict(gridcolor='rgba(0,0,0,0.08)')
-    )
-    return fig
-
-def predict(api_url, payload, coin_symbol=""):
-    max_retries = 1
-    retry_delay = 1
-    
-    for attempt in range(max_retries):
-        try:
-            if coin_symbol == "XRP":
-                response = requests.get(api_url, timeout=30)
-            else:
-                response = requests.get(api_url, params=payload, timeout=120)
-                
-            if response.status_code == 200:
-                result = response.json()
-                
-                if 'error' in result:
-                    if attempt < max_retries - 1:
-                        import time
-                        time.sleep(retry_delay)
-                        continue
-                    return f"API Error: {result['error']}"
-                
-                if coin_symbol == "XRP":
-                    high_value = result.get('high') or result.get('predicted_high_next')
-                    if high_value:
-                        return float(high_value)
-                
-                # Bitcoin format: predicted_next_day_high_usd
-                prediction = result.get('predicted_next_day_high_usd') or result.get('predicted_next_day_high') or result.get('prediction') or result.get('predicted_high') or result.get('next_day_high')
-                if prediction is not None:
-                    return prediction
-                return str(result)
-            elif response.status_code == 429:
-                if attempt < max_retries - 1:
-                    import time
-                    time.sleep(retry_delay * (attempt + 1))
-                    continue
-                return "API busy, please try again"
-            else:
-                return f"API Error: {response.status_code}"
-        except requests.exceptions.Timeout:
-            if attempt < max_retries - 1:
-                continue
-            return "Request Timeout"
-        except requests.exceptions.ConnectionError:
-            if attempt < max_retries - 1:
-                import time
-                time.sleep(retry_delay)
-                continue
-            return "Connection Error"
-        except Exception as e:
-            return f"Error: {str(e)}"
-    
-    return "Failed after retries"
+CoinInfo = namedtuple('CoinInfo', 'cid symbol icon_url api_url')
+COINS = {
+    "Bitcoin": CoinInfo("bitcoin", "BTC", "https://raw.githubusercontent.com/spothq/cryptocurrency-icons/master/128/color/btc.png", API_URLS["BTC"]),
+    "Ethereum": CoinInfo("ethereum", "ETH", "https://raw.githubusercontent.com/spothq/cryptocurrency-icons/master/128/color/eth.png", API_URLS["ETH"]),
+    "XRP": CoinInfo("ripple", "XRP", "https://raw.githubusercontent.com/spothq/cryptocurrency-icons/master/128/color/xrp.png", API_URLS["XRP"]),
+    "Solana": CoinInfo("solana", "SOL", "https://s2.coinmarketcap.com/static/img/coins/128x128/5426.png", API_URLS["SOL"])
+}
+TICKER_SYMBOLS = {coin.cid: coin.symbol for coin in COINS.values()}
+MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+PREDICTION_PAYLOAD = {
+    "open": 100, "high": 105, "low": 95, "close": 102,
+    "volume": 3000000, "marketCap": 1.0e9,
+    "price_diff": 5, "daily_range": 10, "SMA_7": 101
+}
+# APIs that accept the features as a JSON POST body; the rest only take query parameters
+JSON_PREDICT_APIS = {"BTC", "SOL"}
+HEALTH_URLS = [urlsplit(url)._replace(path="/health", query="").geturl() for url in API_URLS.values()]
 
-st.markdown("""
+_CSS = """
 <style>
 header[data-testid="stHeader"] { background: transparent; }
 [data-testid="stToolbar"] { display: none; }
@@ -228,10 +120,374 @@ div[data-testid="stMarkdown"] p {
     color: #4A4A4A;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+_TICKER_HTML = "<div class='ticker'><span>{}</span></div>"
+_CANDLESTICK_HTML = Template("""
+<div style="font-family:sans-serif;color:#3A3A3A;font-size:14px;margin:4px 0 8px">$symbol 7-Day Candlestick Chart</div>
+<div id="chart" style="height:380px"></div>
+<script src="https://unpkg.com/lightweight-charts@4.1.3/dist/lightweight-charts.standalone.production.js"></script>
+<script>
+const chart = LightweightCharts.createChart(document.getElementById("chart"), {
+    autoSize: true,
+    layout: { background: { color: "#FFFFFF" }, textColor: "#3A3A3A", fontSize: 10 },
+    grid: { vertLines: { color: "rgba(0,0,0,0.08)" }, horzLines: { color: "rgba(0,0,0,0.08)" } },
+});
+const series = chart.addCandlestickSeries({
+    upColor: "rgba(76, 175, 80, 0.7)", downColor: "rgba(239, 83, 80, 0.7)",
+    borderUpColor: "#4CAF50", borderDownColor: "#EF5350",
+    wickUpColor: "#4CAF50", wickDownColor: "#EF5350",
+});
+series.setData($data);
+chart.timeScale().fitContent();
+</script>
+""")
+TICKER_ITEM = (
+    "<span style='color:#2C2C2C;font-weight:600'>{symbol}/USD</span> "
+    "<span style='color:#5A5A5A'>{price:,.2f}</span> "
+    "<span style='color:{color};font-weight:600'>{arrow}{change:.2f}%</span>"
+)
+TICKER_COLORS = ("#D9534F", "#2D9F4F")  # indexed by change >= 0
+TICKER_ARROWS = ("▼", "▲")
+
+if 'predictions' not in st.session_state:
+    st.session_state.predictions = {}
+if 'prediction_time' not in st.session_state:
+    st.session_state.prediction_time = {}
+if 'selected_coin' not in st.session_state:
+    st.session_state.selected_coin = 'Bitcoin'
+
+@st.cache_resource
+def _event_loop():
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+@st.cache_resource
+def _client_session():
+    async def _open():
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=16, limit_per_host=16, keepalive_timeout=60, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=30),
+            headers={"Accept-Encoding": "gzip, br"}
+        )
+    return asyncio.run_coroutine_threadsafe(_open(), _event_loop()).result()
+
+def run_many(coros):
+    async def _gather():
+        return await asyncio.gather(*coros, return_exceptions=True)
+    return asyncio.run_coroutine_threadsafe(_gather(), _event_loop()).result()
+
+async def _fetch_json(session, url, params=None, timeout=30, retries=2, backoff=0.3, json_body=None):
+    for attempt in range(retries + 1):
+        if json_body is not None:
+            request = session.post(url, json=json_body, timeout=aiohttp.ClientTimeout(total=timeout))
+        else:
+            request = session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=timeout))
+        async with request as response:
+            if response.status in RETRY_STATUSES and attempt < retries:
+                await asyncio.sleep(backoff * 2 ** attempt)
+                continue
+            response.raise_for_status()
+            return orjson.loads(await response.read())
+
+@st.cache_resource
+def _redis():
+    if not REDIS_URL:
+        return None
+    # Only builds the client; connecting happens lazily on the event loop, so this never blocks it
+    return redis.asyncio.Redis(connection_pool=redis.asyncio.ConnectionPool.from_url(REDIS_URL, socket_timeout=0.5))
+
+# `client` comes from _redis() on the script thread; Streamlit caches must not be touched from the loop thread
+async def cached_get(session, client, url, params=None, ttl=60, stale_ttl=600, timeout=30, json_body=None):
+    params = params or {}
+    key_source = url + urlencode(sorted(params.items()))
+    if json_body is not None:
+        key_source += orjson.dumps(json_body, option=orjson.OPT_SORT_KEYS).decode()
+    key = "cache:" + hashlib.sha1(key_source.encode()).hexdigest()
+    body, stale_at = None, 0.0
+    if client is not None:
+        try:
+            body, stale_at = await client.hmget(key, "body", "stale_at")
+            stale_at = float(stale_at or 0)
+        except redis.RedisError:
+            client = None
+    
+    now = time.time()
+    if body is not None and now < stale_at:
+        return orjson.loads(body)
+    try:
+        result = await _fetch_json(session, url, params or None, timeout, json_body=json_body)
+    except Exception:
+        # Upstream is down or rate limiting us: serve the stale copy while it is within grace
+        if body is not None and now < stale_at + stale_ttl:
+            return orjson.loads(body)
+        raise
+    
+    if client is not None and not (isinstance(result, dict) and 'error' in result):
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping={"body": orjson.dumps(result), "stale_at": now + ttl})
+                pipe.expire(key, ttl + stale_ttl)
+                await pipe.execute()
+        except redis.RedisError:
+            pass
+    return result
+
+@st.cache_resource
+def _prediction_cache():
+    return OrderedDict(), threading.Lock()
+
+def _prediction_key(api_url, payload):
+    # Same model + same (rounded) features always gives the same prediction
+    return api_url, tuple(round(payload[k], 4) for k in sorted(payload))
+
+def lookup_prediction(key):
+    cache, lock = _prediction_cache()
+    with lock:
+        if key not in cache:
+            return None
+        prediction, stored_at = cache[key]
+        if time.time() - stored_at >= PREDICTION_REFRESH:
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return prediction
 
-prices_html = get_crypto_prices()
-st.markdown(f"<div class='ticker'><span>{prices_html}</span></div>", unsafe_allow_html=True)
+def store_prediction(key, prediction):
+    cache, lock = _prediction_cache()
+    with lock:
+        cache[key] = (prediction, time.time())
+        cache.move_to_end(key)
+        if len(cache) > PREDICTION_CACHE_SIZE:
+            cache.popitem(last=False)
+
+def _get_json(url, params=None, ttl=60, timeout=30):
+    result, = run_many([cached_get(_client_session(), _redis(), url, params, ttl=ttl, timeout=timeout)])
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+async def _ping(session, url):
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=60)) as response:
+        return response.status
+
+@st.cache_resource
+def warmup_apis():
+    # Render free-tier dynos sleep after ~15 min idle; keep them awake in the background
+    session = _client_session()
+    async def _keep_warm():
+        while True:
+            await asyncio.gather(*(_ping(session, url) for url in HEALTH_URLS), return_exceptions=True)
+            await asyncio.sleep(WARMUP_INTERVAL)
+    return asyncio.run_coroutine_threadsafe(_keep_warm(), _event_loop())
+
+def cached_render(key, ttl, render):
+    # Rendered HTML/SVG is shared across workers through Redis when it is configured
+    client = _redis()
+    if client is not None:
+        cached, = run_many([client.get(key)])
+        if isinstance(cached, bytes):
+            return cached.decode()
+    html = render()
+    if client is not None:
+        run_many([client.setex(key, ttl, html)])
+    return html
+
+@st.cache_data(ttl=60)
+def get_market_data():
+    # One /coins/markets call carries the ticker prices and the 7-day sparklines for every coin
+    params = {
+        "vs_currency": "usd",
+        "ids": ",".join(coin.cid for coin in COINS.values()),
+        "sparkline": "true",
+        "price_change_percentage": "24h"
+    }
+    try:
+        return {market["id"]: market for market in _get_json(MARKETS_URL, params, ttl=60, timeout=10)}
+    except Exception:
+        return {}
+
+def _ticker_html():
+    markets = get_market_data()
+    if not markets:
+        raise ValueError("No data received")
+    parts = []
+    for coin, market in markets.items():
+        change = market.get("price_change_percentage_24h") or 0
+        up = change >= 0
+        parts.append(TICKER_ITEM.format(
+            symbol=TICKER_SYMBOLS[coin],
+            price=market.get("current_price") or 0,
+            color=TICKER_COLORS[up],
+            arrow=TICKER_ARROWS[up],
+            change=abs(change)
+        ))
+    return "  ".join(parts)
+
+@st.cache_data(ttl=60)
+def get_crypto_prices():
+    try:
+        return cached_render("ticker:prices", 60, _ticker_html)
+    except Exception:
+        return "BTC/USD 67,450 ▲1.25% ETH/USD 3,120 ▲0.84% XRP/USD 0.512 ▼0.34% SOL/USD 102.4 ▲2.02%"
+
+def _daily_ohlc(market):
+    prices = (market.get("sparkline_in_7d") or {}).get("price")
+    if not prices:
+        return None
+    try:
+        # The sparkline carries no timestamps: it is hourly and ends at last_updated
+        end = pd.to_datetime(market["last_updated"]).tz_convert(None)
+        series = pd.Series(prices, index=pd.date_range(end=end, periods=len(prices), freq=pd.Timedelta(hours=1)))
+        
+        # Daily OHLC in one resample pass
+        ohlc = series.resample("1D").ohlc().dropna().tail(7)  # Only return the last 7 days
+        return ohlc.rename_axis("date").reset_index()
+    except Exception:
+        return None
+
+@st.cache_data(ttl=60)
+def get_coin_histories():
+    markets = get_market_data()
+    return {coin.cid: _daily_ohlc(markets[coin.cid]) if coin.cid in markets else None for coin in COINS.values()}
+
+@st.cache_data(ttl=60)
+def render_candles_svg(df, symbol, width=700, height=400):
+    pad_x, pad_top, pad_bottom = 60, 40, 30
+    low, high = df['low'].min(), df['high'].max()
+    span = (high - low) or 1
+    slot = (width - 2 * pad_x) / len(df)
+    
+    def y(value):
+        return pad_top + (high - value) / span * (height - pad_top - pad_bottom)
+    
+    parts = [
+        f"<svg viewBox='0 0 {width} {height}' width='100%' style='background:#FFFFFF;border-radius:8px' font-family='sans-serif' font-size='11' fill='#3A3A3A'>",
+        f"<text x='{pad_x}' y='22' font-size='14'>{symbol} 7-Day Candlestick Chart</text>",
+        f"<text x='{pad_x - 6}' y='{y(high):.1f}' text-anchor='end'>{high:,.2f}</text>",
+        f"<text x='{pad_x - 6}' y='{y(low):.1f}' text-anchor='end'>{low:,.2f}</text>",
+    ]
+    for i, row in enumerate(df.itertuples(index=False)):
+        x = pad_x + slot * (i + 0.5)
+        up = row.close >= row.open
+        color = '#4CAF50' if up else '#EF5350'
+        fill = 'rgba(76, 175, 80, 0.7)' if up else 'rgba(239, 83, 80, 0.7)'
+        top, bottom = y(max(row.open, row.close)), y(min(row.open, row.close))
+        parts.append(f"<line x1='{x:.1f}' y1='{y(row.high):.1f}' x2='{x:.1f}' y2='{y(row.low):.1f}' stroke='{color}'/>")
+        parts.append(
+            f"<rect x='{x - slot * 0.3:.1f}' y='{top:.1f}' width='{slot * 0.6:.1f}' height='{max(bottom - top, 1):.1f}' "
+            f"fill='{fill}' stroke='{color}'/>"
+        )
+        parts.append(f"<text x='{x:.1f}' y='{height - 10}' text-anchor='middle'>{row.date:%m-%d}</text>")
+    parts.append("</svg>")
+    return "".join(parts)
+
+@st.cache_data(ttl=60)
+def get_chart_svg(cid, symbol):
+    coin_data = get_coin_histories()[cid]
+    return cached_render(f"chart:{cid}", 60, lambda: render_candles_svg(coin_data, symbol))
+
+def candlestick_widget_html(df, symbol):
+    candles = [
+        {"time": f"{row.date:%Y-%m-%d}", "open": float(row.open), "high": float(row.high), "low": float(row.low), "close": float(row.close)}
+        for row in df.itertuples(index=False)
+    ]
+    return _CANDLESTICK_HTML.substitute(symbol=symbol, data=orjson.dumps(candles).decode())
+
+async def predict_async(session, client, api_url, payload, coin_symbol=""):
+    # Transient failures (429/5xx) are already retried by _fetch_json
+    try:
+        if coin_symbol == "XRP":
+            result = await cached_get(session, client, api_url, ttl=PREDICTION_REFRESH, stale_ttl=PREDICTION_TTL, timeout=30)
+        elif coin_symbol in JSON_PREDICT_APIS:
+            result = await cached_get(session, client, api_url, json_body=payload, ttl=PREDICTION_REFRESH, stale_ttl=PREDICTION_TTL, timeout=120)
+        else:
+            result = await cached_get(session, client, api_url, payload, ttl=PREDICTION_REFRESH, stale_ttl=PREDICTION_TTL, timeout=120)
+        
+        if 'error' in result:
+            return f"API Error: {result['error']}"
+        
+        prediction = next((result[k] for k in PREDICTION_KEYS if k in result and result[k] is not None), None)
+        if prediction is not None:
+            return float(prediction)
+        return str(result)
+    except aiohttp.ClientResponseError as e:
+        if e.status == 429:
+            return "API busy, please try again"
+        return f"API Error: {e.status}"
+    except asyncio.TimeoutError:
+        return "Request Timeout"
+    except aiohttp.ClientConnectionError:
+        return "Connection Error"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@st.fragment(run_every=60)
+def ticker_fragment():
+    st.markdown(_TICKER_HTML.format(get_crypto_prices()), unsafe_allow_html=True)
+
+@st.fragment
+def prediction_fragment(symbol):
+    col_btn, col_result = st.columns([1, 2])
+
+    with col_btn:
+        predict_btn = st.button(f"Predict {symbol} High(D+1)", key=f"{symbol}_predict")
+        predict_all_btn = st.button("Predict All", key="predict_all")
+
+    with col_result:
+        if predict_btn or predict_all_btn:
+        
+            now = time.time()
+            targets = [coin for coin in COINS.values() if predict_all_btn or coin.symbol == symbol]
+            pending = [
+                coin for coin in targets
+                if now - st.session_state.prediction_time.get(coin.symbol, 0) >= PREDICTION_REFRESH or coin.symbol not in st.session_state.predictions
+            ]
+            misses = []
+            for coin in pending:
+                prediction = lookup_prediction(_prediction_key(coin.api_url, PREDICTION_PAYLOAD))
+                if prediction is None:
+                    misses.append(coin)
+                else:
+                    st.session_state.predictions[coin.symbol] = prediction
+                    st.session_state.prediction_time[coin.symbol] = now
+            if not pending:
+                st.info("Using cached prediction (refreshes every 3 min)")
+            elif misses:
+                with st.spinner(f"Predicting {', '.join(coin.symbol for coin in misses)}..."):
+                    session, client = _client_session(), _redis()
+                    results = run_many([predict_async(session, client, coin.api_url, PREDICTION_PAYLOAD, coin_symbol=coin.symbol) for coin in misses])
+                    for coin, prediction in zip(misses, results):
+                        if isinstance(prediction, Exception):
+                            prediction = f"Error: {str(prediction)}"
+                        elif isinstance(prediction, float):
+                            store_prediction(_prediction_key(coin.api_url, PREDICTION_PAYLOAD), prediction)
+                        st.session_state.predictions[coin.symbol] = prediction
+                        st.session_state.prediction_time[coin.symbol] = now
+    
+        if symbol in st.session_state.predictions:
+            result = st.session_state.predictions[symbol]
+            if isinstance(result, (int, float)):
+                st.markdown(f"<div class='result-box'><h3>Predicted High: ${result:,.2f}</h3></div>", unsafe_allow_html=True)
+            else:
+                st.markdown(f"<div class='result-box'><h3>Predicted High: {result}</h3></div>", unsafe_allow_html=True)
+
+@st.fragment
+def chart_fragment(cid, symbol):
+    coin_data = get_coin_histories()[cid]
+    if coin_data is not None and not coin_data.empty:
+        if st.toggle("Interactive chart", key="interactive_chart"):
+            components.html(candlestick_widget_html(coin_data, symbol), height=420)
+        else:
+            st.markdown(get_chart_svg(cid, symbol), unsafe_allow_html=True)
+    else:
+        st.error(f"Unable to load {symbol} candlestick chart")
+
+warmup_apis()
+
+st.markdown(_CSS, unsafe_allow_html=True)
+
+ticker_fragment()
 
 st.title("Crypto Next-Day High Price Prediction Dashboard")
 
@@ -251,23 +507,7 @@ with col4:
 
 st.markdown("---")
 
-API_URLS = {
-    "BTC": "https://at3-bitcoin-latest-1.onrender.com/predict/bitcoin",
-    "ETH": "https://ethereum-api-studentB.onrender.com/predict",
-    "XRP": "https://three6120-25sp-at3-group08-25660135-api.onrender.com/predict_latest",
-    "SOL": "https://solana-fastapi.onrender.com/predict" 
-}
-
-coins_data = {
-    "Bitcoin": ("bitcoin", "BTC", "https://raw.githubusercontent.com/spothq/cryptocurrency-icons/master/128/color/btc.png", API_URLS["BTC"]),
-    "Ethereum": ("ethereum", "ETH", "https://raw.githubusercontent.com/spothq/cryptocurrency-icons/master/128/color/eth.png", API_URLS["ETH"]),
-    "XRP": ("ripple", "XRP", "https://raw.githubusercontent.com/spothq/cryptocurrency-icons/master/128/color/xrp.png", API_URLS["XRP"]),
-    "Solana": ("solana", "SOL", "https://s2.coinmarketcap.com/static/img/coins/128x128/5426.png", API_URLS["SOL"])
-}
-
-
-
-cid, symbol, icon_url, api_url = coins_data[st.session_state.selected_coin]
+cid, symbol, icon_url, api_url = COINS[st.session_state.selected_coin]
 
 
 try:
@@ -275,44 +515,11 @@ try:
 except:
     st.write(f"🪙 {symbol}")
 
-col_btn, col_result = st.columns([1, 2])
-
-with col_btn:
-    predict_btn = st.button(f"Predict {symbol} High(D+1)", key=f"{symbol}_predict")
-
-with col_result:
-    if predict_btn:
-        
-        import time
-        last_time = st.session_state.prediction_time.get(symbol, 0)
-        if time.time() - last_time < 180 and symbol in st.session_state.predictions:
-            st.info("Using cached prediction (refreshes every 3 min)")
-        else:
-            with st.spinner(f'Predicting {symbol}...'):
-                prediction = predict(api_url, {
-                    "open": 100, "high": 105, "low": 95, "close": 102,
-                    "volume": 3000000, "marketCap": 1.0e9,
-                    "price_diff": 5, "daily_range": 10, "SMA_7": 101
-                }, coin_symbol=symbol)
-                st.session_state.predictions[symbol] = prediction
-                st.session_state.prediction_time[symbol] = time.time()
-    
-    if symbol in st.session_state.predictions:
-        result = st.session_state.predictions[symbol]
-        if isinstance(result, (int, float)):
-            st.markdown(f"<div class='result-box'><h3>Predicted High: ${result:,.2f}</h3></div>", unsafe_allow_html=True)
-        else:
-            st.markdown(f"<div class='result-box'><h3>Predicted High: {result}</h3></div>", unsafe_allow_html=True)
+prediction_fragment(symbol)
 
 st.markdown("---")
 
-coin_data = get_coin_history(cid)
-if coin_data:
-    candle_fig = plot_candlestick(coin_data, symbol)
-    if candle_fig:
-        st.plotly_chart(candle_fig, use_container_width=True)
-else:
-    st.error(f"Unable to load {symbol} candlestick chart")
+chart_fragment(cid, symbol)
 
 st.markdown("---")
 st.markdown("<div style='text-align: center; color: #8B7355; padding: 1rem;'><p>Data: CoinGecko API | Group 8 Project AT3</p></div>", unsafe_allow_html=True)
\ No newline at end of file
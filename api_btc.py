@@ -1,9 +1,19 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+from pydantic import BaseModel
+from typing import List
 import joblib
 import numpy as np
+import os
+import threading
 
-app = FastAPI(title="Bitcoin Price Prediction API")
+app = FastAPI(title="Bitcoin Price Prediction API", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,10 +23,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-try:
-    model = joblib.load("models/bitcoin_model.pkl")
-except:
-    model = None
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, quality=4, minimum_size=256)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=256)
+
+MODEL_PATH = "models/bitcoin_model.pkl"
+
+# Sync endpoints run on the threadpool, so each worker thread gets its own feature buffer
+_local = threading.local()
+
+def _feature_buffer():
+    buf = getattr(_local, "buf", None)
+    if buf is None:
+        buf = _local.buf = np.empty((1, 9), dtype=np.float32)
+    return buf
+
+model = None
+
+@app.on_event("startup")
+async def load_model():
+    global model
+    try:
+        model = joblib.load(MODEL_PATH, mmap_mode='r')
+    except:
+        model = None
+
+@app.on_event("startup")
+async def warmup():
+    if model is not None:
+        try:
+            model.predict(np.zeros((1, 9)))
+        except Exception:
+            pass
+
+class PredictionRequest(BaseModel):
+    open: float = 67000
+    high: float = 67500
+    low: float = 66800
+    close: float = 67200
+    volume: float = 25000000000
+    marketCap: float = 1300000000000
+    price_diff: float = 700
+    daily_range: float = 500
+    SMA_7: float = 67100
 
 @app.get("/")
 def root():
@@ -39,9 +89,17 @@ def predict_bitcoin(
     SMA_7: float = 67100
 ):
     try:
-        features = np.array([[open, high, low, close, volume, marketCap, price_diff, daily_range, SMA_7]])
-        
         if model is not None:
+            features = _feature_buffer()
+            features[0, 0] = open
+            features[0, 1] = high
+            features[0, 2] = low
+            features[0, 3] = close
+            features[0, 4] = volume
+            features[0, 5] = marketCap
+            features[0, 6] = price_diff
+            features[0, 7] = daily_range
+            features[0, 8] = SMA_7
             prediction = float(model.predict(features)[0])
         else:
             prediction = high * 1.015
@@ -54,6 +112,42 @@ def predict_bitcoin(
     except Exception as e:
         return {"error": str(e)}
 
+@app.post("/predict/bitcoin")
+def predict_bitcoin_post(request: PredictionRequest):
+    return predict_bitcoin(**request.model_dump())
+
+@app.post("/predict_batch")
+def predict_bitcoin_batch(batch: List[PredictionRequest]):
+    if not batch:
+        return []
+    try:
+        features = np.empty((len(batch), 9), dtype=np.float32)
+        for i, r in enumerate(batch):
+            features[i] = (r.open, r.high, r.low, r.close, r.volume, r.marketCap, r.price_diff, r.daily_range, r.SMA_7)
+        
+        if model is not None:
+            predictions = model.predict(features)
+        else:
+            predictions = features[:, 1] * 1.015
+        
+        return [
+            {
+                "predicted_next_day_high": round(float(prediction), 2),
+                "currency": "Bitcoin (BTC)",
+                "model": "Random Forest"
+            }
+            for prediction in predictions
+        ]
+    except Exception as e:
+        return {"error": str(e)}
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 2))
+    uvicorn.run(
+        "api_btc:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        access_log=False
+    )
\ No newline at end of file
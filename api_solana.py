@@ -1,15 +1,25 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel
+from typing import List
+from collections import OrderedDict
+import asyncio
 import joblib
 import numpy as np
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
 import os
 
 # ===================== FastAPI Initialization =====================
 app = FastAPI(
     title="Solana Price Prediction API",
     description="Predict Solana next-day high price using LightGBM model",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # ===================== CORS Settings ====================
@@ -21,20 +31,171 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ===================== Response Compression ====================
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, quality=4, minimum_size=256)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=256)
+
 # ===================== Loading Model =====================
 MODEL_PATH = "models/solana_lightgbm_model.pkl"
+# Plain-text dump of the booster; much faster to load than unpickling the sklearn wrapper
+MODEL_TXT_PATH = "models/solana_lightgbm_model.txt"
+COMPILED_MODEL_CACHE = "models/solana_lightgbm_model.elf"
 
-try:
-    if os.path.exists(MODEL_PATH):
-        model = joblib.load(MODEL_PATH)
+def model_text_is_fresh():
+    return os.path.exists(MODEL_TXT_PATH) and os.path.getmtime(MODEL_TXT_PATH) >= os.path.getmtime(MODEL_PATH)
+
+def compiled_cache_is_fresh():
+    # Compared by mtime instead of deleting the ELF on re-export, so a worker never removes one another just built
+    return os.path.exists(COMPILED_MODEL_CACHE) and os.path.getmtime(COMPILED_MODEL_CACHE) >= os.path.getmtime(MODEL_TXT_PATH)
+
+def load_model():
+    try:
+        if not os.path.exists(MODEL_PATH):
+            print(f"Warning: Model file not found at {MODEL_PATH}")
+            print("   Using fallback prediction (high * 1.02)")
+            return None
+        if model_text_is_fresh():
+            import lightgbm
+            model = lightgbm.Booster(model_file=MODEL_TXT_PATH)
+            print(f"Model loaded successfully from {MODEL_TXT_PATH}")
+            return model
+        # Memory-map the numpy arrays so worker processes share pages instead of copying them
+        model = joblib.load(MODEL_PATH, mmap_mode='r')
         print(f"Model loaded successfully from {MODEL_PATH}")
-    else:
-        model = None
-        print(f"Warning: Model file not found at {MODEL_PATH}")
-        print("   Using fallback prediction (high * 1.02)")
-except Exception as e:
-    model = None
-    print(f"Error loading model: {e}")
+        try:
+            # Workers start concurrently: write under a per-process name and rename into place
+            # so no worker ever sees a half-written dump that already passes the freshness check
+            tmp_path = f"{MODEL_TXT_PATH}.{os.getpid()}.tmp"
+            model.booster_.save_model(tmp_path)
+            os.replace(tmp_path, MODEL_TXT_PATH)
+        except Exception as e:
+            print(f"Warning: could not export booster text: {e}")
+        return model
+    except Exception as e:
+        print(f"Error loading model: {e}")
+        return None
+
+# ===================== Native Compilation (lleaves) =====================
+def compile_model(model):
+    """Compile the LightGBM trees to native code with lleaves; keep the original model if unavailable"""
+    try:
+        import lleaves
+    except ImportError:
+        return model
+    if not model_text_is_fresh():
+        return model
+    try:
+        compiled = lleaves.Model(model_file=MODEL_TXT_PATH)
+        # The cached ELF avoids re-running LLVM on every restart
+        if compiled_cache_is_fresh():
+            compiled.compile(cache=COMPILED_MODEL_CACHE)
+        else:
+            # Same per-process temp name + rename as the text dump, for the same concurrent-worker reason
+            tmp_path = f"{COMPILED_MODEL_CACHE}.{os.getpid()}.tmp"
+            compiled.compile(cache=tmp_path)
+            os.replace(tmp_path, COMPILED_MODEL_CACHE)
+        print(f"Model compiled with lleaves (cache: {COMPILED_MODEL_CACHE})")
+        return compiled
+    except Exception as e:
+        print(f"lleaves compilation failed, using LightGBM: {e}")
+        return model
+
+# Loaded on startup rather than at import, so the `python api_solana.py` launcher
+# and the __mp_main__ re-import in each worker don't hold extra copies of the model
+model = None
+
+@app.on_event("startup")
+async def load_models():
+    global model
+    model = load_model()
+    if model is not None:
+        model = compile_model(model)
+
+@app.on_event("startup")
+async def warmup():
+    """Run one dummy prediction so the first real request doesn't pay first-touch cost"""
+    if model is not None:
+        try:
+            model.predict(np.zeros((1, 9)))
+        except Exception as e:
+            print(f"Warmup prediction failed: {e}")
+
+# ===================== Micro-Batching =====================
+MAX_BATCH = 128
+MAX_WAIT = 0.005  # seconds to wait for more requests before running a batch
+
+# Only the batcher task writes here and it finishes one batch before starting the next.
+# float64 because lleaves only accepts float64 (float32 would be copied on every batch),
+# and rounding volume/marketCap to float32 can flip rows across split thresholds
+_BUF = np.empty((MAX_BATCH, 9), dtype=np.float64)
+
+async def batcher(prediction_queue):
+    """Collect concurrent requests and run them through model.predict in one call"""
+    loop = asyncio.get_running_loop()
+    while True:
+        features, future = await prediction_queue.get()
+        rows, futures = [features], [future]
+        deadline = loop.time() + MAX_WAIT
+        while len(rows) < MAX_BATCH:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                features, future = await asyncio.wait_for(prediction_queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            rows.append(features)
+            futures.append(future)
+        
+        for i, row in enumerate(rows):
+            _BUF[i] = row
+        
+        try:
+            predictions = await loop.run_in_executor(None, model.predict, _BUF[:len(rows)])
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+        for future, prediction in zip(futures, predictions):
+            if not future.done():
+                future.set_result(float(prediction))
+
+async def batched_predict(features):
+    """Queue one row of 9 feature values for the batcher and wait for its prediction"""
+    future = asyncio.get_running_loop().create_future()
+    await app.state.prediction_queue.put((features, future))
+    return await future
+
+# ===================== Shared Prediction Core =====================
+PREDICTION_CACHE_SIZE = 4096
+
+prediction_cache = OrderedDict()
+
+async def predict_core(features):
+    """Single inference path for GET and POST: LRU cache on the rounded features, batcher on misses"""
+    if model is None:
+        # Fallback: Simple Estimation
+        return features[1] * 1.02  # Assuming tomorrow's high is 2% higher than today's
+    
+    key = tuple(round(v, 4) for v in features)
+    if key in prediction_cache:
+        prediction_cache.move_to_end(key)
+        return prediction_cache[key]
+    prediction = await batched_predict(key)
+    prediction_cache[key] = prediction
+    if len(prediction_cache) > PREDICTION_CACHE_SIZE:
+        prediction_cache.popitem(last=False)
+    return prediction
+
+@app.on_event("startup")
+async def start_batcher():
+    if model is not None:
+        # Created here so the queue binds to the loop uvicorn actually runs, not the import-time one
+        app.state.prediction_queue = asyncio.Queue()
+        app.state.batcher_task = asyncio.create_task(batcher(app.state.prediction_queue))
 
 # ===================== Request Format Definition ====================
 class PredictionRequest(BaseModel):
@@ -65,7 +226,7 @@ class PredictionRequest(BaseModel):
 
 # ==================== Root Path =====================
 @app.get("/")
-def read_root():
+async def read_root():
     """API Basic Information"""
     return {
         "message": "Solana (SOL) Price Prediction API",
@@ -77,14 +238,20 @@ def read_root():
             "GET /": "API 資訊",
             "GET /predict": "預測明日最高價 (Query Parameters)",
             "POST /predict": "預測明日最高價 (JSON Body)",
+            "POST /predict_batch": "批次預測明日最高價 (JSON Array)",
+            "POST /predict_batch/raw": "批次預測明日最高價 (float32 Binary)",
             "GET /health": "健康檢查"
         },
-        "example_request": "GET /predict?open=100&high=105&low=95&close=102&volume=3000000&marketCap=1e9&price_diff=5&daily_range=10&SMA_7=101"
+        "example_request": "GET /predict?open=100&high=105&low=95&close=102&volume=3000000&marketCap=1e9&price_diff=5&daily_range=10&SMA_7=101&verbose=1"
     }
 
+# ===================== Response Template =====================
+# Fields shared by every prediction response; clients round the prediction for display
+BASE_RESPONSE = {"currency": "Solana (SOL)"}
+
 # ===================== Predict Endpoint (GET) =====================
 @app.get("/predict")
-def predict_get(
+async def predict_get(
     open: float,
     high: float,
     low: float,
@@ -93,29 +260,23 @@ def predict_get(
     marketCap: float,
     price_diff: float,
     daily_range: float,
-    SMA_7: float
+    SMA_7: float,
+    verbose: bool = False
 ):
     try:
         # Combined feature vectors
-        features = np.array([[
+        features = (
             open, high, low, close, volume, marketCap,
             price_diff, daily_range, SMA_7
-        ]])
+        )
         
         # Execute Prediction
-        if model is not None:
-            prediction = float(model.predict(features)[0])
-            prediction_source = "LightGBM Model"
-        else:
-           # Fallback: Simple Estimation
-            prediction = high * 1.02  # Assuming tomorrow's high is 2% higher than today's
-            prediction_source = "Fallback Estimation (Model not loaded)"
+        prediction = await predict_core(features)
+        prediction_source = "LightGBM Model" if model is not None else "Fallback Estimation (Model not loaded)"
         
-        return {
-            "predicted_next_day_high": round(prediction, 4),
-            "currency": "Solana (SOL)",
-            "model": prediction_source,
-            "input_features": {
+        response = {**BASE_RESPONSE, "predicted_next_day_high": prediction, "model": prediction_source}
+        if verbose:
+            response["input_features"] = {
                 "open": open,
                 "high": high,
                 "low": low,
@@ -126,7 +287,7 @@ def predict_get(
                 "daily_range": daily_range,
                 "SMA_7": SMA_7
             }
-        }
+        return response
     
     except Exception as e:
         raise HTTPException(
@@ -136,33 +297,76 @@ def predict_get(
 
 # ===================== Predict Endpoint (POST) =====================
 @app.post("/predict")
-def predict_post(request: PredictionRequest):
+async def predict_post(request: PredictionRequest):
     try:
-        features = np.array([[
+        features = (
             request.open, request.high, request.low, request.close,
             request.volume, request.marketCap, request.price_diff,
             request.daily_range, request.SMA_7
-        ]])
+        )
+        
+        prediction = await predict_core(features)
+        prediction_source = "LightGBM Model" if model is not None else "Fallback Estimation"
+        
+        return {**BASE_RESPONSE, "predicted_next_day_high": prediction, "model": prediction_source}
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+# ===================== Batch Predict Endpoint (POST) =====================
+@app.post("/predict_batch")
+async def predict_batch(batch: List[PredictionRequest]):
+    """Predict several feature rows with a single model call"""
+    if not batch:
+        return []
+    try:
+        features = np.empty((len(batch), 9), dtype=np.float64)
+        for i, r in enumerate(batch):
+            features[i] = (
+                r.open, r.high, r.low, r.close, r.volume, r.marketCap,
+                r.price_diff, r.daily_range, r.SMA_7
+            )
         
         if model is not None:
-            prediction = float(model.predict(features)[0])
+            predictions = await asyncio.get_running_loop().run_in_executor(None, model.predict, features)
             prediction_source = "LightGBM Model"
         else:
-            prediction = request.high * 1.02
+            predictions = features[:, 1] * 1.02
             prediction_source = "Fallback Estimation"
         
-        return {
-            "predicted_next_day_high": round(prediction, 4),
-            "currency": "Solana (SOL)",
-            "model": prediction_source
-        }
+        return [
+            {**BASE_RESPONSE, "predicted_next_day_high": prediction, "model": prediction_source}
+            for prediction in predictions.tolist()
+        ]
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+# ===================== Binary Batch Predict Endpoint (POST) =====================
+@app.post("/predict_batch/raw", response_class=Response)
+async def predict_batch_raw(request: Request):
+    """Raw float32 (N, 9) rows in, raw float32 (N,) predictions out"""
+    body = await request.body()
+    if not body:
+        return Response(b"", media_type="application/octet-stream")
+    if len(body) % (9 * 4):
+        raise HTTPException(status_code=400, detail="Body must be float32 rows of 9 features")
+    try:
+        features = np.frombuffer(body, dtype=np.float32).reshape(-1, 9)
+        
+        if model is not None:
+            predictions = await asyncio.get_running_loop().run_in_executor(None, model.predict, features)
+        else:
+            predictions = features[:, 1] * 1.02
+        
+        return Response(np.asarray(predictions, dtype=np.float32).tobytes(), media_type="application/octet-stream")
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 # ===================== Health Check =====================
 @app.get("/health")
-def health_check():
+async def health_check():
     """Check API and model status"""
     return {
         "status": "healthy",
@@ -173,7 +377,7 @@ def health_check():
 
 # ==================== Test Endpoints =====================
 @app.get("/test")
-def test_prediction():
+async def test_prediction():
     """Quick Test Prediction Function"""
     test_data = {
         "open": 102.5,
@@ -187,7 +391,7 @@ def test_prediction():
         "SMA_7": 103.1
     }
     
-    result = predict_get(**test_data)
+    result = await predict_get(**test_data)
     return {
         "message": "Test prediction successful",
         "test_input": test_data,
@@ -199,4 +403,11 @@ if __name__ == "__main__":
     import uvicorn
     print("Starting Solana FastAPI server...")
     print("Visit http://localhost:8000/docs for API documentation")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 2))
+    uvicorn.run(
+        "api_solana:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        access_log=False
+    )
\ No newline at end of file
@@ -1,10 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+import asyncio
 import joblib
-import pandas as pd
+import os
 import numpy as np
 
-app = FastAPI(title="XRP Prediction API")
+app = FastAPI(title="XRP Prediction API", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,46 +21,82 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load Model
-try:
-    pipeline = joblib.load("models/25660135_at3_pipeline.pkl")
-    model = joblib.load("models/25660135_at3_ridge.pkl")
-    print("Models loaded successfully")
-except Exception as e:
-    model = None
-    print(f"Error loading model: {e}")
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, quality=4, minimum_size=256)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=256)
+
+# Fixed feature row used by /predict_latest (no external API calls)
+LATEST_DATA = {
+    'open': 0.5,
+    'high': 0.52,
+    'low': 0.49,
+    'close': 0.51,
+    'volume': 1000000,
+    'marketCap': 25000000000,
+    'price_diff': 0.03,
+    'daily_range': 0.03,
+    'SMA_7': 0.505
+}
+
+latest_features = np.array([list(LATEST_DATA.values())])
+onnx_input = {"input": latest_features.astype(np.float32)}
+
+pipeline = None
+model = None
+onnx_session = None
+
+@app.on_event("startup")
+async def load_models():
+    global pipeline, model, onnx_session
+    # Load Model
+    try:
+        pipeline = joblib.load("models/25660135_at3_pipeline.pkl", mmap_mode='r')
+        model = joblib.load("models/25660135_at3_ridge.pkl", mmap_mode='r')
+        print("Models loaded successfully")
+        # Fitted on a DataFrame but served a bare ndarray; drop the names so scikit-learn
+        # doesn't warn "X does not have valid feature names" on every request
+        if hasattr(model, "feature_names_in_"):
+            del model.feature_names_in_
+    except Exception as e:
+        model = None
+        print(f"Error loading model: {e}")
+        return
+
+    # Serve the Ridge model through ONNX Runtime when skl2onnx/onnxruntime are installed
+    try:
+        import onnxruntime
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+        onnx_model = convert_sklearn(model, initial_types=[("input", FloatTensorType([None, len(LATEST_DATA)]))])
+        onnx_session = onnxruntime.InferenceSession(onnx_model.SerializeToString(), providers=["CPUExecutionProvider"])
+        print("Model converted to ONNX")
+    except ImportError:
+        pass
+    except Exception as e:
+        print(f"ONNX conversion failed, using scikit-learn: {e}")
 
 @app.get("/")
-def root():
+async def root():
     return {"message": "XRP Prediction API is running!"}
 
 @app.get("/health")
-def health():
+async def health():
     return {
         "status": "Ridge Regressor is ready" if model else "Model not loaded",
         "model_loaded": model is not None
     }
 
 @app.get("/predict_latest")
-def predict_latest():
+async def predict_latest():
     try:
         if model is None:
             return {"error": "Model not loaded"}
         
-        # Predict using fixed data (without calling external APIs)
-        latest_data = pd.DataFrame({
-            'open': [0.5],
-            'high': [0.52],
-            'low': [0.49],
-            'close': [0.51],
-            'volume': [1000000],
-            'marketCap': [25000000000],
-            'price_diff': [0.03],
-            'daily_range': [0.03],
-            'SMA_7': [0.505]
-        })
-        
-        prediction = model.predict(latest_data)
+        if onnx_session is not None:
+            prediction = onnx_session.run(None, onnx_input)[0].ravel()
+        else:
+            prediction = await asyncio.get_running_loop().run_in_executor(None, model.predict, latest_features)
         return {"high": str(prediction[0])}
         
     except Exception as e:
@@ -61,4 +104,11 @@ def predict_latest():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 2))
+    uvicorn.run(
+        "api_xrp:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        access_log=False
+    )
\ No newline at end of file